@@ -1,291 +1,457 @@
 import os
-import glob
+import io
 import subprocess
+import shutil
 import time
 import sys
+import re
+import threading
+import functools
+import itertools
+from collections import deque
 from pathlib import Path
-import whisper
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from tqdm import tqdm
-import threading
 
 # Необходимые библиотеки:
-# pip install openai-whisper ffmpeg-python tqdm
+# pip install "faster-whisper>=1.1.0" ffmpeg-python tqdm numpy
+# Для других бэкендов распознавания (опционально):
+# pip install openai-whisper   или   pip install pywhispercpp
+# или   pip install optimum[onnxruntime]
+
+# Бэкенд распознавания, задается переменной окружения WHISPER_BACKEND
+BACKENDS = ("faster-whisper", "openai-whisper", "pywhispercpp", "onnxruntime")
+WHISPER_BACKEND = os.environ.get("WHISPER_BACKEND", "faster-whisper")
+
+# Каталог с моделью для бэкенда onnxruntime. Модель готовится один раз:
+# optimum-cli export onnx --model openai/whisper-medium whisper-medium-onnx-fp32
+# optimum-cli onnxruntime optimize --onnx_model whisper-medium-onnx-fp32 -O2 -o whisper-medium-onnx-opt
+# optimum-cli onnxruntime quantize --onnx_model whisper-medium-onnx-opt --avx2 --per_channel -o whisper-medium-onnx
+ONNX_MODEL_DIR = "whisper-medium-onnx"
+
+# Формат аудио, которое ожидает Whisper
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4  # float32
+
+# Параметры декодирования faster-whisper: жадный поиск без повторов с другой температурой
+# и без подстановки предыдущего текста в контекст декодера
+TRANSCRIBE_OPTIONS = dict(
+    beam_size=1,
+    best_of=1,
+    temperature=0,
+    condition_on_previous_text=False,
+    # Silero VAD вырезает паузы длиннее полусекунды, чтобы модель не тратила время на тишину
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500),
+)
+
+# Сколько фрагментов по 30 секунд обрабатывается за один проход энкодера
+BATCH_SIZE = 8
 
-def get_video_duration(video_path):
+# Ядра для процессов ffmpeg в пакетном режиме (None — без привязки)
+_ffmpeg_cpus = None
+TASKSET = shutil.which("taskset")
+
+# Строка с длительностью входного файла в журнале ffmpeg
+DURATION_RE = re.compile(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+# Минимальный шаг роста буфера для вывода ffmpeg (размер буфера канала в Linux)
+CHUNK_SIZE = 64 * 1024
+
+def _cpu_count():
     """
-    Получает длительность видео в секундах с помощью ffprobe
+    Возвращает число ядер, доступных текущему процессу
     """
-    command = [
-        "ffprobe", 
-        "-v", "error", 
-        "-show_entries", "format=duration", 
-        "-of", "default=noprint_wrappers=1:nokey=1", 
-        video_path
-    ]
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    try:
-        return float(result.stdout.strip())
-    except (ValueError, IndexError):
-        return 0
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count()
 
-def extract_audio(video_path, output_audio_path):
+def split_cpus(count):
     """
-    Извлекает аудио дорожку из видео файла с помощью ffmpeg с отображением прогресса
+    Разводит ffmpeg и модель по непересекающимся наборам ядер на время пакетной
+    обработки: процессам ffmpeg достается count ядер (не больше половины),
+    текущему процессу с моделью остальные. Вызывается из основного потока до загрузки
+    модели, чтобы ее потоки наследовали новую привязку, а их число считалось
+    по оставшимся ядрам. Работает только в Linux
     """
-    print(f"🎬 Подготовка к извлечению аудио из {video_path}...")
-    
-    # Получаем длительность видео
-    duration = get_video_duration(video_path)
-    if duration <= 0:
-        print("⚠️ Не удалось определить продолжительность видео. Прогресс не будет отображаться.")
-        # Если не удалось определить длительность, просто запускаем ffmpeg без отслеживания прогресса
-        command = [
-            "ffmpeg", 
-            "-i", video_path,
-            "-q:a", "0",
-            "-map", "a",
-            "-y",
-            output_audio_path
-        ]
-        subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    else:
-        # Создаем прогресс-бар
-        progress_bar = tqdm(total=100, desc="Извлечение аудио", 
-                          unit="%", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}")
-        
-        # Команда для получения временных меток ffmpeg
-        command = [
-            "ffmpeg", 
-            "-i", video_path,
-            "-q:a", "0",
-            "-map", "a",
-            "-y",
-            "-progress", "pipe:1",  # Вывод прогресса в stdout
-            output_audio_path
-        ]
-        
-        # Запускаем процесс
-        process = subprocess.Popen(
-            command, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            universal_newlines=True
-        )
-        
-        # Отслеживаем прогресс
-        for line in process.stdout:
-            if line.startswith("out_time_ms="):
-                try:
-                    time_ms = float(line.split("=")[1].strip())
-                    current_time = time_ms / 1000000  # Конвертируем микросекунды в секунды
-                    progress = min(int((current_time / duration) * 100), 100)
-                    progress_bar.update(progress - progress_bar.n)
-                except (ValueError, IndexError):
-                    pass
-        
-        # Завершаем процесс и закрываем прогресс-бар
-        process.wait()
-        progress_bar.close()
+    global _ffmpeg_cpus
     
-    # Проверяем, существует ли файл
-    if os.path.exists(output_audio_path):
-        print(f"✅ Аудио успешно извлечено в {output_audio_path}")
-    else:
-        print(f"❌ Ошибка при извлечении аудио.")
-        sys.exit(1)
+    if not sys.platform.startswith("linux"):
+        return
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < 2:
+        return
+    count = max(1, min(count, len(cpus) // 2))
+    _ffmpeg_cpus = set(cpus[:count])
+    # Привязка меняется для вызывающего потока, созданные после этого потоки ее наследуют
+    os.sched_setaffinity(0, cpus[count:])
+
+def _read_duration(stream, found):
+    """
+    Читает журнал ffmpeg до конца и запоминает длительность входного файла
+    из строки вида "Duration: 00:12:34.56"
+    """
+    # Канал открыт без буферизации, поэтому оборачиваем его, чтобы строки
+    # читались блоками, а не по одному байту за системный вызов
+    stream = io.BufferedReader(stream)
+    for line in stream:
+        match = DURATION_RE.search(line)
+        if match and "duration" not in found:
+            hours, minutes, seconds = match.groups()
+            found["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    stream.close()
 
-def estimate_audio_duration(audio_path):
+def _grow_buffer(buffer, received, duration):
+    """
+    Выделяет буфер для отсчетов ffmpeg: сразу под всю длительность, если она известна,
+    иначе с удвоением размера. Уже прочитанные данные переносятся в новый буфер
     """
-    Оценивает длительность аудио файла для расчета прогресса
+    size = max(received + CHUNK_SIZE, 2 * received)
+    if duration:
+        size = max(size, int(duration * SAMPLE_RATE) * BYTES_PER_SAMPLE + CHUNK_SIZE)
+    grown = np.empty(size, dtype=np.uint8)
+    if buffer is not None:
+        grown[:received] = buffer[:received]
+    return grown
+
+def decode_audio_f32(video_path, show_progress=True):
     """
+    Декодирует аудио дорожку видео файла через ffmpeg прямо в память
+    (16 кГц, моно, float32) с отображением прогресса. Возвращает None, если извлечь аудио
+    не удалось. При show_progress=False функция ничего не выводит, что удобно
+    для параллельного запуска
+    """
+    if show_progress:
+        print(f"🎬 Подготовка к извлечению аудио из {video_path}...")
+    
+    # ffmpeg сразу отдает отсчеты в формате, который ожидает Whisper, без временных файлов
     command = [
-        "ffprobe", 
-        "-v", "error", 
-        "-show_entries", "format=duration", 
-        "-of", "default=noprint_wrappers=1:nokey=1", 
-        audio_path
+        "ffmpeg", 
+        "-hide_banner",
+        "-nostats",
+        "-vn",                      # До -i: видеопотоки даже не открываются для декодирования
+        "-i", video_path,
+        "-ac", "1",                 # Whisper работает с моно
+        "-ar", str(SAMPLE_RATE),    # и частотой дискретизации 16 кГц
+        "-f", "f32le",              # Сырые float32 отсчеты
+        "-"                         # Вывод в stdout
     ]
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    try:
-        return float(result.stdout.strip())
-    except (ValueError, IndexError):
-        return 0
+    
+    # В пакетном режиме ffmpeg запускается через taskset: привязка к его ядрам
+    # задается еще до exec и действует на все потоки декодера
+    if _ffmpeg_cpus and TASKSET:
+        command = [TASKSET, "-c", ",".join(map(str, sorted(_ffmpeg_cpus)))] + command
+    
+    # Запускаем процесс; из журнала ffmpeg берется длительность для прогресс-бара
+    # и для выделения буфера под отсчеты
+    process = subprocess.Popen(
+        command, 
+        stdout=subprocess.PIPE, 
+        stderr=subprocess.PIPE,
+        bufsize=0
+    )
+    
+    # Без taskset переносим на ядра ffmpeg уже запущенный процесс. Это действует только
+    # на его основной поток: потоки, которые ffmpeg успел создать до вызова, остаются
+    # на ядрах модели, поэтому разделение в этом случае не гарантировано
+    if _ffmpeg_cpus and not TASKSET:
+        try:
+            os.sched_setaffinity(process.pid, _ffmpeg_cpus)
+        except OSError:
+            pass  # Процесс уже успел завершиться
+    
+    # Длительность берем из заголовка, который ffmpeg пишет в журнал при открытии файла,
+    # вместо отдельного запуска ffprobe; журнал читается в фоне, чтобы не забить канал
+    found = {}
+    stderr_reader = threading.Thread(target=_read_duration, args=(process.stderr, found),
+                                     daemon=True)
+    stderr_reader.start()
+    
+    # Создаем прогресс-бар
+    progress_bar = tqdm(total=100, desc="Извлечение аудио", disable=not show_progress,
+                        unit="%", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}")
+    
+    # Читаем отсчеты из канала сразу в буфер numpy, без промежуточных объектов bytes,
+    # и считаем прогресс по объему уже декодированного аудио
+    buffer = None
+    received = 0
+    while True:
+        if buffer is None or received == len(buffer):
+            buffer = _grow_buffer(buffer, received, found.get("duration"))
+        read = process.stdout.readinto(memoryview(buffer)[received:])
+        if not read:
+            break
+        received += read
+        if found.get("duration"):
+            total_bytes = found["duration"] * SAMPLE_RATE * BYTES_PER_SAMPLE
+            progress = min(int(received / total_bytes * 100), 100)
+            progress_bar.update(progress - progress_bar.n)
+    
+    # Завершаем процесс и закрываем прогресс-бар
+    returncode = process.wait()
+    process.stdout.close()
+    stderr_reader.join()
+    progress_bar.update(100 - progress_bar.n)
+    progress_bar.close()
+    
+    # Проверяем, что ffmpeg отработал и вернул хотя бы какие-то отсчеты
+    if returncode != 0 or received < BYTES_PER_SAMPLE:
+        return None
+    
+    # Отсчеты отдаются модели как представление того же буфера, без копирования.
+    # Если длительность не удалось узнать заранее и буфер вырос с большим запасом,
+    # копируем данные, чтобы не держать в памяти лишнее
+    received -= received % BYTES_PER_SAMPLE
+    if len(buffer) - received > CHUNK_SIZE:
+        audio = buffer[:received].copy().view(np.float32)
+    else:
+        audio = buffer[:received].view(np.float32)
+    if show_progress:
+        print(f"✅ Аудио успешно извлечено из {video_path} ({len(audio) / SAMPLE_RATE:.1f} сек)")
+    return audio
 
-class TranscriptionProgressTracker:
+def select_device():
+    """
+    Выбирает устройство и точность вычислений для модели faster-whisper:
+    float16 на GPU, int8 на CPU
     """
-    Класс для отслеживания прогресса транскрибирования без использования callback
+    import ctranslate2
+    
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "cuda", "float16"
+    return "cpu", "int8"
+
+@functools.lru_cache(maxsize=1)
+def _get_model(backend=WHISPER_BACKEND, name="medium"):
     """
-    def __init__(self, audio_duration):
-        self.audio_duration = audio_duration
-        self.progress_bar = None
-        self.running = True
-        self.temp_file = None
-        self.last_size = 0
+    Загружает модель Whisper для выбранного бэкенда один раз
+    и переиспользует ее при повторных вызовах
+    """
+    if backend == "faster-whisper":
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
         
-    def start_tracking(self, model, temp_file):
-        """
-        Запускает отслеживание прогресса в отдельном потоке
-        """
-        self.temp_file = temp_file
-        self.progress_bar = tqdm(total=100, desc="Распознавание речи", 
-                               unit="%", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}")
+        # На GPU в половинной точности, на CPU с int8 квантизацией весов
+        device, compute_type = select_device()
+        model = WhisperModel(name, device=device, compute_type=compute_type,
+                             cpu_threads=_cpu_count())
+        # Фрагменты речи, найденные VAD, прогоняются через энкодер пачками (faster-whisper>=1.1.0).
+        # Пакетный режим декодирует без временных меток и режет речь на фрагменты
+        # не длиннее 30 секунд, поэтому разбиение на сегменты отличается от обычного
+        return BatchedInferencePipeline(model=model)
+    
+    if backend == "openai-whisper":
+        import torch
+        import whisper
         
-        # Оцениваем скорость обработки на основе первых нескольких секунд
-        try:
-            # Предполагаем, что файл модели whisper_state.csv будет создан во временной директории
-            thread = threading.Thread(target=self._track_progress)
-            thread.daemon = True
-            thread.start()
-        except Exception as e:
-            print(f"⚠️ Ошибка при отслеживании прогресса: {e}")
-            return None
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        torch.set_num_threads(_cpu_count())
+        return whisper.load_model(name, device=device)
+    
+    if backend == "pywhispercpp":
+        from pywhispercpp.model import Model
         
-        return self.progress_bar
-    
-    def _track_progress(self):
-        """
-        Отслеживает прогресс, проверяя созданные временные файлы или состояние Whisper
-        """
-        # Начальное значение прогресса
-        progress = 0
-        last_update = time.time()
+        # Квантованная q5_0 модель ggml, скачивается при первом запуске
+        return Model(f"{name}-q5_0", n_threads=_cpu_count())
+    
+    if backend == "onnxruntime":
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import AutoProcessor, pipeline
         
-        while self.running and progress < 100:
-            time.sleep(0.5)  # Проверяем прогресс каждые полсекунды
-            
-            # Если есть временный файл, проверяем его размер
-            if self.temp_file and os.path.exists(self.temp_file):
-                current_size = os.path.getsize(self.temp_file)
-                if current_size > self.last_size:
-                    # Увеличиваем прогресс на основе изменения размера файла
-                    self.last_size = current_size
-                    progress += 1
-                    self.progress_bar.update(1)
-            else:
-                # Если нет временного файла, используем временную эвристику
-                current_time = time.time()
-                if current_time - last_update >= 1.0:  # Обновляем каждую секунду
-                    # Используем простую эвристику для прогресса
-                    progress += 1
-                    self.progress_bar.update(1 if progress <= 95 else 0)  # Останавливаемся на 95%
-                    last_update = current_time
-            
-            # Предотвращаем превышение 100%
-            if progress > 100:
-                progress = 100
-                
-        # Завершаем прогресс-бар при выходе из цикла
-        if self.progress_bar:
-            self.progress_bar.update(100 - self.progress_bar.n)  # Достигаем 100%
-    
-    def stop(self):
-        """
-        Останавливает отслеживание прогресса
-        """
-        self.running = False
-        if self.progress_bar:
-            self.progress_bar.close()
+        # Граф с объединенными блоками внимания и int8 весами, все оптимизации ORT включены
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = _cpu_count()
+        ort_model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            ONNX_MODEL_DIR,
+            provider="CPUExecutionProvider",
+            session_options=session_options
+        )
+        processor = AutoProcessor.from_pretrained(ONNX_MODEL_DIR)
+        return pipeline(
+            "automatic-speech-recognition",
+            model=ort_model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=30
+        )
+    
+    raise ValueError(f"Неизвестный бэкенд распознавания: {backend}")
 
-def transcribe_audio(audio_path, output_text_path):
+def _transcribe_segments(model, audio, backend=WHISPER_BACKEND):
     """
-    Транскрибирует аудио файл с помощью локальной модели Whisper (medium)
-    с эмуляцией отслеживания прогресса
+    Запускает распознавание выбранным бэкендом и возвращает пары
+    (время окончания сегмента в секундах, текст сегмента) и длительность аудио
     """
-    print(f"🎤 Загружаем модель Whisper (medium)...")
+    if backend == "faster-whisper":
+        # Сегменты генерируются лениво по мере декодирования
+        segments, info = model.transcribe(audio, batch_size=BATCH_SIZE, **TRANSCRIBE_OPTIONS)
+        return ((segment.end, segment.text) for segment in segments), info.duration
     
-    # Отображаем прогресс загрузки модели
-    with tqdm(total=1, desc="Загрузка модели", unit="шаг") as progress_bar:
-        # Загружаем medium модель
-        model = whisper.load_model("medium")
-        progress_bar.update(1)
+    duration = len(audio) / SAMPLE_RATE
     
-    print(f"🎧 Начинаем распознавание текста из аудио {audio_path}...")
+    if backend == "openai-whisper":
+        # temperature=0 без beam_size/best_of означает жадный поиск без повторов
+        result = model.transcribe(
+            audio,
+            temperature=0,
+            condition_on_previous_text=False,
+            fp16=model.device.type == "cuda",
+            verbose=None
+        )
+        return ((segment["end"], segment["text"]) for segment in result["segments"]), duration
     
-    # Оценка длительности аудио для отслеживания прогресса
-    audio_duration = estimate_audio_duration(audio_path)
+    if backend == "pywhispercpp":
+        # Время сегментов в whisper.cpp задается в сотых долях секунды
+        segments = model.transcribe(audio, no_context=True)
+        return ((segment.t1 / 100, segment.text) for segment in segments), duration
     
-    # Создаем временный файл для отслеживания прогресса
-    temp_file = f"{output_text_path}.tmp"
-    if os.path.exists(temp_file):
-        os.remove(temp_file)
-        
-    # Запускаем трекер прогресса
-    progress_tracker = TranscriptionProgressTracker(audio_duration)
-    progress_tracker.start_tracking(model, temp_file)
+    if backend == "onnxruntime":
+        result = model(
+            {"raw": audio, "sampling_rate": SAMPLE_RATE},
+            batch_size=BATCH_SIZE,
+            return_timestamps=True
+        )
+        # У последнего фрагмента время окончания может быть не указано
+        return (((chunk["timestamp"][1] or duration), chunk["text"])
+                for chunk in result["chunks"]), duration
+    
+    raise ValueError(f"Неизвестный бэкенд распознавания: {backend}")
+
+def load_model():
+    """
+    Загружает модель Whisper (medium) выбранного бэкенда с отображением прогресса.
+    Вызывается один раз за запуск, дальше модель переиспользуется для всех видео
+    """
+    print(f"🎤 Загружаем модель Whisper (medium), бэкенд {WHISPER_BACKEND}...")
+    
+    # Отображаем прогресс загрузки модели
+    with tqdm(total=1, desc="Загрузка модели", unit="шаг") as progress_bar:
+        model = _get_model()
+        progress_bar.update(1)
+    return model
+
+def transcribe_audio(model, audio, output_text_path):
+    """
+    Транскрибирует аудио (массив float32, 16 кГц) загруженной моделью Whisper
+    с отслеживанием прогресса по распознанным сегментам
+    """
+    print(f"🎧 Начинаем распознавание текста из аудио...")
     
     try:
         # Выполняем транскрибирование
-        result = model.transcribe(audio_path, verbose=False)
+        segments, duration = _transcribe_segments(model, audio)
         
-        # Создаем временный файл для отслеживания
-        with open(temp_file, "w", encoding="utf-8") as f:
-            f.write("1" * 100)  # Просто для имитации прогресса
-            
-        # Получаем текст из результата
-        transcription = result["text"]
-        
-        # Сохраняем результат в текстовый файл
-        with open(output_text_path, "w", encoding="utf-8") as text_file:
-            text_file.write(transcription)
-            
-        # Останавливаем отслеживание прогресса
-        progress_tracker.stop()
-        
-        # Удаляем временный файл
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        # Пишем каждый сегмент в файл сразу после распознавания, чтобы при сбое
+        # уже готовый текст не терялся; прогресс считаем по концу последнего сегмента
+        parts = []
+        with open(output_text_path, "w", encoding="utf-8") as text_file, \
+             tqdm(total=round(duration, 1), desc="Распознавание речи", unit="сек",
+                  bar_format="{l_bar}{bar}| {n:.0f}/{total:.0f} сек") as progress_bar:
+            for end, text in segments:
+                parts.append(text)
+                text_file.write(text)
+                text_file.flush()
+                progress_bar.update(min(end, progress_bar.total) - progress_bar.n)
+            progress_bar.update(progress_bar.total - progress_bar.n)
+        transcription = "".join(parts)
         
         print(f"✅ Текст успешно распознан и сохранен в {output_text_path}")
         return transcription
     
     except Exception as e:
-        progress_tracker.stop()
         print(f"❌ Ошибка при распознавании: {e}")
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
         raise
 
+def process_one(model, video_path, text_path, audio):
+    """
+    Транскрибирует уже извлеченное аудио одного видео и выводит краткий итог
+    """
+    # Транскрибирование аудио с отображением прогресса
+    transcription = transcribe_audio(model, audio, text_path)
+    
+    # Размер файла и превью считаем по уже имеющемуся тексту, не обращаясь к диску
+    text_size = len(transcription.encode("utf-8"))
+    preview = transcription[:150] + ("..." if len(transcription) > 150 else "")
+    
+    print("\n" + "="*60)
+    print(f"📂 Исходный файл: {video_path}")
+    print(f"📝 Файл транскрипции: {text_path}")
+    print(f"💾 Размер файла транскрипции: {text_size} байт")
+    print("-"*60)
+    print("📌 Первые 150 символов транскрипции:")
+    print(preview)
+    print("="*60)
+
 def main():
     start_time = time.time()
     
-    print("🔍 Ищем MP4 файл в текущей директории...")
-    # Найти единственный mp4 файл в текущей директории
-    mp4_files = glob.glob("*.mp4")
+    if WHISPER_BACKEND not in BACKENDS:
+        print(f"❌ Ошибка: неизвестный бэкенд {WHISPER_BACKEND}, доступны: {', '.join(BACKENDS)}")
+        return
+    
+    print("🔍 Ищем MP4 файлы в текущей директории...")
+    # Один проход по директории вместо сопоставления с шаблоном
+    with os.scandir(".") as entries:
+        mp4_files = [Path(entry.name) for entry in entries
+                     if entry.is_file() and entry.name.lower().endswith(".mp4")]
     
     if not mp4_files:
         print("❌ Ошибка: MP4 файл не найден в текущей директории!")
         return
     
-    if len(mp4_files) > 1:
-        print(f"⚠️ Внимание: Найдено несколько MP4 файлов. Будет использован первый: {mp4_files[0]}")
-    
-    video_path = mp4_files[0]
-    base_name = Path(video_path).stem
-    
-    # Пути для выходных файлов
-    audio_path = f"{base_name}.mp3"
-    text_path = f"{base_name}_transcription.txt"
-    
-    # Извлечение аудио с отображением прогресса
-    extract_audio(video_path, audio_path)
+    # Пути для выходных файлов строим заранее для всех видео
+    jobs = [(video, video.with_name(f"{video.stem}_transcription.txt")) for video in mp4_files]
     
-    # Транскрибирование аудио с эмуляцией отображения прогресса
-    transcription = transcribe_audio(audio_path, text_path)
+    if len(jobs) == 1:
+        # Извлечение аудио в память с отображением прогресса
+        video_path, text_path = jobs[0]
+        audio = decode_audio_f32(video_path)
+        if audio is None:
+            print(f"❌ Ошибка при извлечении аудио из {video_path}.")
+            sys.exit(1)
+        process_one(load_model(), video_path, text_path, audio)
+    else:
+        print(f"📚 Найдено {len(mp4_files)} MP4 файлов, обрабатываем все")
+        
+        # ffmpeg работает в отдельных процессах, поэтому потоков достаточно для параллельного
+        # извлечения; модель при этом одна и распознает файлы по очереди по мере готовности аудио
+        max_workers = max(1, min(len(mp4_files), (_cpu_count() or 2) // 2))
+        
+        # Извлечение идет одновременно с распознаванием на протяжении всего пакета,
+        # поэтому ffmpeg и модель получают разные ядра
+        split_cpus(max_workers)
+        # Одновременно в работе не больше max_workers извлечений: следующее видео
+        # начинает декодироваться, только когда очередное уходит на распознавание,
+        # чтобы аудио всех файлов не копилось в памяти
+        decode = functools.partial(decode_audio_f32, show_progress=False)
+        remaining = iter(jobs)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for video_path, text_path in itertools.islice(remaining, max_workers):
+                pending.append((video_path, text_path, executor.submit(decode, video_path)))
+            
+            # Модель загружается один раз, пока идет извлечение первых файлов
+            model = load_model()
+            
+            while pending:
+                video_path, text_path, future = pending.popleft()
+                audio = future.result()
+                for next_video, next_text in itertools.islice(remaining, 1):
+                    pending.append((next_video, next_text, executor.submit(decode, next_video)))
+                
+                # Ошибка в одном файле не должна останавливать весь пакет
+                if audio is None:
+                    print(f"❌ Ошибка при извлечении аудио из {video_path}, файл пропущен.")
+                    continue
+                print(f"✅ Аудио извлечено из {video_path} ({len(audio) / SAMPLE_RATE:.1f} сек)")
+                process_one(model, video_path, text_path, audio)
     
     # Вычисляем общее время выполнения
     total_time = time.time() - start_time
     minutes, seconds = divmod(total_time, 60)
-    
-    print("\n" + "="*60)
     print(f"🎉 Задача выполнена за {int(minutes)} мин {int(seconds)} сек!")
-    print(f"📂 Исходный файл: {video_path}")
-    print(f"🎵 Извлеченное аудио: {audio_path}")
-    print(f"📝 Файл транскрипции: {text_path}")
-    print(f"💾 Размер файла транскрипции: {os.path.getsize(text_path)} байт")
-    print("-"*60)
-    print("📌 Первые 150 символов транскрипции:")
-    print(transcription[:150] + "..." if len(transcription) > 150 else transcription)
-    print("="*60)
 
 if __name__ == "__main__":
     main()